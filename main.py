@@ -1,58 +1,131 @@
 import os
+import hashlib
 import uvicorn
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from email.utils import formatdate, parsedate
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from src.logger.logger import Logger
 from contextlib import asynccontextmanager
 from src.auth_routes import router as auth_router
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from src.api_routes import router as api_router
+from src.static_files import CachedStaticFiles
+from src.oneEdge.oneEdgeAPI import AuthError, OneEdgeApiError, create_http_session
+from src import session_cache
 
 # Initialize the logger
 logger = Logger(name=__name__)
 
+# Comma-separated list of origins allowed to call the API from a browser
+CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3250").split(",")
+
+HEALTHY_BODY = b'{"status":"healthy"}'
+
+INDEX_PATH = "src/templates/index.html"
+INDEX_BYTES: bytes = b""
+INDEX_ETAG: str = ""
+INDEX_MTIME: str = ""
+
+
+def load_index() -> None:
+    """
+    Read index.html once so it can be served from memory.
+    """
+    global INDEX_BYTES, INDEX_ETAG, INDEX_MTIME
+    with open(INDEX_PATH, "rb") as f:
+        INDEX_BYTES = f.read()
+    INDEX_ETAG = f'"{hashlib.md5(INDEX_BYTES).hexdigest()}"'
+    INDEX_MTIME = formatdate(os.path.getmtime(INDEX_PATH), usegmt=True)
+
+
+def index_not_modified(request: Request) -> bool:
+    """
+    Check the conditional request headers against the cached index.html.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or INDEX_ETAG in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        since = parsedate(if_modified_since)
+        return since is not None and since >= parsedate(INDEX_MTIME)
+    return False
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Application is starting up")
+    load_index()
+    app.state.http = create_http_session()
     yield
     # Shutdown
     logger.info("Application is shutting down")
+    await app.state.http.close()
 
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["authorization", "content-type"],
+    max_age=600,
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 # Include the auth routes
 app.include_router(auth_router, prefix="/auth", tags=["authentication"])
 # Include the api routes
 app.include_router(api_router, prefix="/api", tags=["api"])
 # Serve static files
-app.mount("/static", StaticFiles(directory="src/static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="src/static"), name="static")
+
+
+# Translate oneEdge API client errors into HTTP responses, dropping the cached
+# verification of a session that upstream has rejected
+@app.exception_handler(OneEdgeApiError)
+async def one_edge_api_error_handler(request: Request, exc: OneEdgeApiError):
+    if isinstance(exc, AuthError):
+        session_cache.invalidate(request.cookies.get("session"))
+    return JSONResponse({"detail": exc.message}, status_code=exc.status_code)
 
 
-# Serve index.html
+# Serve index.html from memory
 @app.get("/")
-async def read_index():
-    logger.info("Serving index.html")
-    return FileResponse("src/templates/index.html")
+async def read_index(request: Request):
+    if index_not_modified(request):
+        return Response(status_code=304, headers={"ETag": INDEX_ETAG})
+    return Response(
+        INDEX_BYTES,
+        media_type="text/html",
+        headers={
+            "ETag": INDEX_ETAG,
+            "Last-Modified": INDEX_MTIME,
+            "Cache-Control": "public, max-age=3600",
+        },
+    )
 
 
 # Add a health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return Response(HEALTHY_BODY, media_type="application/json")
 
 if __name__ == "__main__":
     host = "100.81.13.11"
     port = 8230
-    workers = 3
+    workers = int(os.getenv("WORKERS", os.cpu_count() or 2))
 
-    uvicorn.run("main:app", host=host, port=port, workers=workers)
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        access_log=False,
+    )
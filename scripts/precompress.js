@@ -0,0 +1,30 @@
+// Writes .br and .gz siblings of the built static assets so the server can
+// serve them without compressing on every request.
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+
+const roots = ['src/static/dist', 'src/static/css'];
+const extensions = new Set(['.js', '.css', '.html']);
+
+function walk(dir) {
+    return fs.readdirSync(dir, { withFileTypes: true }).flatMap((entry) => {
+        const fullPath = path.join(dir, entry.name);
+        return entry.isDirectory() ? walk(fullPath) : [fullPath];
+    });
+}
+
+for (const root of roots) {
+    if (!fs.existsSync(root)) continue;
+    for (const file of walk(root)) {
+        if (!extensions.has(path.extname(file))) continue;
+        const content = fs.readFileSync(file);
+        fs.writeFileSync(`${file}.gz`, zlib.gzipSync(content, { level: 9 }));
+        fs.writeFileSync(
+            `${file}.br`,
+            zlib.brotliCompressSync(content, {
+                params: { [zlib.constants.BROTLI_PARAM_QUALITY]: 11 },
+            })
+        );
+    }
+}
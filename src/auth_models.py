@@ -0,0 +1,24 @@
+"""
+Auth Models
+"""
+
+from fastapi.security import OAuth2PasswordBearer
+from pydantic import BaseModel, ConfigDict
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+
+
+class User(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    username: str
+    mfa_code: str | None = None
+
+
+class Token(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    access_token: str
+    token_type: str
+    requireMFA: bool = False
+    username: str | None = None
@@ -2,107 +2,115 @@
 Auth Routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from fastapi.responses import JSONResponse
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.security import OAuth2PasswordRequestForm
 from src.logger.logger import Logger
-from src.oneEdge.oneEdgeAPI import OneEdgeApi, OneEdgeApiError, AuthState
+from src.auth_models import User, Token
+from src.oneEdge.oneEdgeAPI import OneEdgeApi, MfaRequiredError, AuthState
+from src.dependencies import get_api
+from src import session_cache
 
 logger = Logger(__name__)
 router = APIRouter()
 
-api_endpoint = "https://api-de.devicewise.com/api"
-one_edge_api = OneEdgeApi(api_endpoint)
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Set-Cookie header that expires the session cookie on logout.
+CLEARED_SESSION_COOKIE = 'session=""; Max-Age=0; Path=/; SameSite=lax'
+# WWW-Authenticate header for failed logins; shared, never mutated.
+BEARER_CHALLENGE = {"WWW-Authenticate": "Bearer"}
 
 
 def is_secure_connection(request: Request) -> bool:
     return request.url.scheme == "https"
 
 
-class User(BaseModel):
-    username: str
-    mfa_code: str | None = None
+def session_cookie(session_id: str, secure: bool, samesite: str) -> str:
+    """
+    Build the Set-Cookie header for the session cookie directly, instead of
+    going through Response.set_cookie and http.cookies.SimpleCookie.
+    """
+    cookie = f"session={session_id}; HttpOnly; Path=/; SameSite={samesite}"
+    return f"{cookie}; Secure" if secure else cookie
+
+
+def token_response(
+    response: Response,
+    session_id: str | None,
+    username: str,
+    cookie: str | None = None,
+) -> Token:
+    """
+    Build the token for a completed login, attaching the session cookie.
+    """
+    if cookie:
+        response.headers["set-cookie"] = cookie
+    return Token(
+        access_token=session_id or "",
+        token_type="bearer",
+        requireMFA=False,
+        username=username,
+    )
 
 
-class Token(BaseModel):
-    access_token: str
-    token_type: str
-    requireMFA: bool = False
-    username: str | None = None
+def mfa_required_response(username: str) -> Token:
+    """
+    Build the token telling the client to submit an MFA code.
+    """
+    return Token(
+        access_token="", token_type="bearer", requireMFA=True, username=username
+    )
 
 
-async def get_user_info(request: Request):
+async def get_user_info(request: Request, api: OneEdgeApi = Depends(get_api)):
     """
     Get user information from the OneEdge API.
     """
     session_id = request.cookies.get("session")
-    if session_id:
-        one_edge_api.session_id = session_id
-        if await one_edge_api._verify_auth_state():
-            return User(username=one_edge_api.username)
+    if not session_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
+        )
+    username = await session_cache.get_verified_user(session_id, api)
+    if username is not None:
+        return User(username=username)
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
     )
 
 
 @router.post("/token", response_model=Token)
-async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(
+    request: Request,
+    response: Response,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    one_edge_api: OneEdgeApi = Depends(get_api),
+):
     try:
         authenticated = await one_edge_api.authenticate_user(
             form_data.username, form_data.password
         )
         if authenticated:
             if one_edge_api.auth_state == AuthState.WAITING_FOR_MFA:
-                return JSONResponse(
-                    content={
-                        "access_token": "",
-                        "token_type": "bearer",
-                        "requireMFA": True,
-                        "username": form_data.username,
-                    },
-                    headers={"Content-Type": "application/json; charset=utf-8"},
-                )
+                return mfa_required_response(form_data.username)
             else:
-                response = JSONResponse(
-                    content={
-                        "access_token": one_edge_api.session_id,
-                        "token_type": "bearer",
-                        "requireMFA": False,
-                        "username": one_edge_api.username,
-                    },
-                    headers={"Content-Type": "application/json; charset=utf-8"},
-                )
+                cookie = None
                 if one_edge_api.session_id:
-                    response.set_cookie(
-                        key="session",
-                    value=one_edge_api.session_id,
-                    httponly=True,
-                    secure=is_secure_connection(request),
-                    samesite="lax",
+                    cookie = session_cookie(
+                        one_edge_api.session_id,
+                        secure=is_secure_connection(request),
+                        samesite="lax",
+                    )
+                logger.info("Login successful", username=one_edge_api.username)
+                return token_response(
+                    response, one_edge_api.session_id, one_edge_api.username, cookie
                 )
-                logger.info(f"Login successful. Session ID: {one_edge_api.session_id}")
-                return response
         else:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except HTTPException as e:
-        if e.status_code == 403 and e.detail == "MFA required":
-            return JSONResponse(
-                content={
-                    "access_token": "",
-                    "token_type": "bearer",
-                    "requireMFA": True,
-                    "username": form_data.username,
-                },
-                headers={"Content-Type": "application/json; charset=utf-8"},
+                headers=BEARER_CHALLENGE,
             )
-        raise e
+    except MfaRequiredError:
+        return mfa_required_response(form_data.username)
 
 
 @router.get("/user", response_model=User)
@@ -114,78 +122,60 @@ async def read_users_me(user: User = Depends(get_user_info)):
 
 
 @router.get("/logout")
-async def logout(current_user: User = Depends(read_users_me)):
+async def logout(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_user_info),
+    one_edge_api: OneEdgeApi = Depends(get_api),
+):
     """
     Logout from the OneEdge API.
     """
-    try:
-        result = await one_edge_api.close_session()
-        if result and result.get("success"):
-            response = JSONResponse({"message": "Logged out successfully"})
-            response.delete_cookie(key="session")
-            return response
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to logout",
-            )
-    except OneEdgeApiError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An error occurred while logging out: {str(e)}",
-        )
+    session_id = request.cookies.get("session")
+    session_cache.invalidate(session_id)
+    one_edge_api.session_id = session_id
+    result = await one_edge_api.close_session()
+    if result and result.get("success"):
+        response.headers["set-cookie"] = CLEARED_SESSION_COOKIE
+        return {"message": "Logged out successfully"}
+    raise HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail="Failed to logout",
+    )
 
 
 @router.post("/mfa", response_model=Token)
-async def submit_mfa(mfa_data: User):
-    try:
-        authenticated = await one_edge_api.submit_mfa(mfa_data.mfa_code)
-        if authenticated:
-            response = JSONResponse(
-                {
-                    "access_token": one_edge_api.session_id,
-                    "token_type": "bearer",
-                    "requireMFA": False,
-                    "username": one_edge_api.username,
-                }
-            )
-            response.set_cookie(
-                key="session",
-                value=one_edge_api.session_id,
-                httponly=True,
-                secure=True,
-                samesite="strict",
-            )
-            return response
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect MFA code",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except OneEdgeApiError as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"An error occurred: {str(e)}",
+async def submit_mfa(
+    mfa_data: User, response: Response, one_edge_api: OneEdgeApi = Depends(get_api)
+):
+    authenticated = await one_edge_api.submit_mfa(
+        mfa_data.mfa_code, username=mfa_data.username
+    )
+    if authenticated:
+        cookie = session_cookie(
+            one_edge_api.session_id, secure=True, samesite="strict"
+        )
+        return token_response(
+            response, one_edge_api.session_id, one_edge_api.username, cookie
         )
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect MFA code",
+        headers=BEARER_CHALLENGE,
+    )
 
 
 @router.get("/validate")
-async def validate_session(request: Request):
+async def validate_session(
+    request: Request, one_edge_api: OneEdgeApi = Depends(get_api)
+):
     session_id = request.cookies.get("session")
-    logger.info(f"Validating session. Session ID: {session_id}")
+    logger.debug("Validating session", cookie_present=session_id is not None)
     if session_id:
-        one_edge_api.session_id = session_id
-        is_valid = await one_edge_api._verify_auth_state()
-        logger.info(f"Session validation result: {is_valid}")
-        if is_valid:
-            return JSONResponse(
-                content={
-                    "message": "Session is valid",
-                    "username": one_edge_api.username,
-                },
-                headers={"Content-Type": "application/json; charset=utf-8"},
-            )
+        username = await session_cache.get_verified_user(session_id, one_edge_api)
+        logger.debug("Session validation finished", is_valid=username is not None)
+        if username is not None:
+            return {"message": "Session is valid", "username": username}
     logger.warning("Session is invalid or expired")
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED, detail="Session is invalid or expired"
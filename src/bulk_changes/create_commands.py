@@ -1,14 +1,138 @@
-from typing import List, Dict, Optional, Any, Union, Tuple
+import asyncio
+from typing import List, Dict, Optional, Any, Union, Tuple, AsyncIterator
+from cachetools import TTLCache
 from src.oneEdge.oneEdgeAPI import OneEdgeApi, OneEdgeApiError
 from src.logger.logger import Logger
+from src.session_cache import cache_key
 
 logger = Logger(__name__)
 
 
+LOOKUP_CACHE_TTL: int = 300
+LOOKUP_PAGE_SIZE: int = 100
+LOOKUP_PAGE_LIMIT: int = 100
+ONBOARDING_CONCURRENCY: int = 16
+ONBOARDING_BATCH_SIZE: int = 25
+ONBOARDING_BATCH_CONCURRENCY: int = 4
+
+# name -> id maps per oneEdge session, so each tenant gets its own view; keyed
+# by session_cache.cache_key so raw session IDs are never held here
+_profiles_by_name: TTLCache = TTLCache(maxsize=256, ttl=LOOKUP_CACHE_TTL)
+_thing_defs_by_name: TTLCache = TTLCache(maxsize=256, ttl=LOOKUP_CACHE_TTL)
+
+# params templates for the per-thing command builders; copied, never mutated
+_TAGS_PARAMS: Dict[str, Any] = {"thingKey": None, "tags": None}
+_PROFILE_CHANGE_PARAMS: Dict[str, Any] = {"thingKey": None, "profileId": None}
+_SETTINGS_PARAMS: Dict[str, Any] = {
+    "thingKey": None,
+    "key": "att_settings_change",
+    "value": None,
+}
+_THING_DEF_CHANGE_PARAMS: Dict[str, Any] = {
+    "key": None,
+    "newDefKey": None,
+    "dropProps": False,
+    "dropAttrs": True,
+    "dropAlarms": True,
+}
+_UNDEPLOY_PARAMS: Dict[str, Any] = {
+    "thingKey": None,
+    "key": "data_destination",
+    "value": "",
+}
+
+
+async def _list_by_name(
+        one_edge_api: OneEdgeApi, command: str, value_key: str
+) -> Tuple[Dict[str, str], bool]:
+    """
+    Page through a oneEdge list command, mapping each item's name to one of its fields.
+
+    Pages of LOOKUP_PAGE_SIZE items are requested until a short page is returned,
+    up to LOOKUP_PAGE_LIMIT pages. The first item with a given name wins.
+
+    :param one_edge_api: Instance of OneEdgeApi.
+    :param command: The list command to run, e.g. "lwm2m.profile.list".
+    :param value_key: The item field to map each name to.
+    :return: The name map and whether every page was fetched successfully.
+        Hitting the page limit counts as incomplete.
+    :raises OneEdgeApiError: If there's an error communicating with the API.
+    """
+    by_name: Dict[str, str] = {}
+    for page_number in range(LOOKUP_PAGE_LIMIT):
+        offset = page_number * LOOKUP_PAGE_SIZE
+        response = await one_edge_api.run_command(
+            {
+                "command": command,
+                "params": {"limit": LOOKUP_PAGE_SIZE, "offset": offset},
+            }
+        )
+        page = response.get("params", {}).get("result", [])
+        for item in page:
+            by_name.setdefault(item.get("name"), item[value_key])
+
+        if not response.get("success"):
+            return by_name, False
+        if len(page) < LOOKUP_PAGE_SIZE:
+            return by_name, True
+
+    logger.warning(
+        "Reached maximum lookup page limit", command=command, limit=LOOKUP_PAGE_LIMIT
+    )
+    return by_name, False
+
+
+async def _load_profiles(one_edge_api: OneEdgeApi) -> Dict[str, str]:
+    """
+    Get the profile name -> ID map, fetching it from the oneEdge API on a cache miss.
+
+    :param one_edge_api: Instance of OneEdgeApi.
+    :return: A dictionary mapping profile names to profile IDs.
+    :raises OneEdgeApiError: If there's an error communicating with the API.
+    """
+    session_id = one_edge_api.session_id
+    key = cache_key(session_id) if session_id else None
+    profiles = _profiles_by_name.get(key) if key else None
+    if profiles is not None:
+        return profiles
+
+    profiles, complete = await _list_by_name(
+        one_edge_api, "lwm2m.profile.list", "id"
+    )
+    if complete and key:
+        _profiles_by_name[key] = profiles
+    return profiles
+
+
+async def _load_thing_defs(one_edge_api: OneEdgeApi) -> Dict[str, str]:
+    """
+    Get the thing definition name -> key map, fetching it from the oneEdge API on a cache miss.
+
+    :param one_edge_api: Instance of OneEdgeApi.
+    :return: A dictionary mapping thing definition names to keys.
+    :raises OneEdgeApiError: If there's an error communicating with the API.
+    """
+    session_id = one_edge_api.session_id
+    key = cache_key(session_id) if session_id else None
+    thing_defs = _thing_defs_by_name.get(key) if key else None
+    if thing_defs is not None:
+        return thing_defs
+
+    thing_defs, complete = await _list_by_name(
+        one_edge_api, "thing_def.list", "key"
+    )
+    if complete and key:
+        _thing_defs_by_name[key] = thing_defs
+    return thing_defs
+
+
 async def get_profile_id(one_edge_api: OneEdgeApi, profile_name: str) -> Optional[str]:
     """
     Get profile ID from the oneEdge API.
 
+    The profile list is cached per session for LOOKUP_CACHE_TTL seconds, so
+    repeated lookups do not hit the API.
+
     :param one_edge_api: Instance of OneEdgeApi.
     :param profile_name: Name of the profile to search for.
     :return: Profile ID if found, None otherwise.
@@ -22,27 +146,24 @@ async def get_profile_id(one_edge_api: OneEdgeApi, profile_name: str) -> Optiona
             print("Profile not found.")
     """
     try:
-        response = await one_edge_api.run_command(
-            {"command": "lwm2m.profile.list", "params": {"limit": 100, "offset": 0}}
-        )
-
-        profile_list = response.get("params", {}).get("result", [])
-
-        for profile in profile_list:
-            if profile.get("name") == profile_name:
-                return profile["id"]
-
-        logger.warning(f"Profile name '{profile_name}' not found.")
-        return None
+        profiles = await _load_profiles(one_edge_api)
     except OneEdgeApiError as e:
         logger.error(f"Error while fetching profile: {e}")
         raise
 
+    profile_id = profiles.get(profile_name)
+    if profile_id is None:
+        logger.warning(f"Profile name '{profile_name}' not found.")
+    return profile_id
+
 
 async def get_thing_def_key(one_edge_api: OneEdgeApi, thing_name: str) -> Optional[str]:
     """
     Get thing definition key from the oneEdge API.
 
+    The thing definition list is cached per session for LOOKUP_CACHE_TTL
+    seconds, so repeated lookups do not hit the API.
+
     :param one_edge_api: Instance of OneEdgeApi.
     :param thing_name: Name of the thing definition to search for.
     :return: Thing definition key if found, None otherwise.
@@ -56,247 +177,184 @@ async def get_thing_def_key(one_edge_api: OneEdgeApi, thing_name: str) -> Option
             print("Thing definition not found.")
     """
     try:
-        response = await one_edge_api.run_command({"command": "thing_def.list"})
-
-        thing_def_list = response.get("params", {}).get("result", [])
-
-        for thing_def in thing_def_list:
-            if thing_def.get("name") == thing_name:
-                return thing_def["key"]
-
-        logger.warning(f"Thing definition name '{thing_name}' not found.")
-        return None
+        thing_defs = await _load_thing_defs(one_edge_api)
     except OneEdgeApiError as e:
         logger.error(f"Failed to get thing definition list: {e}")
         raise
 
+    thing_def_key = thing_defs.get(thing_name)
+    if thing_def_key is None:
+        logger.warning(f"Thing definition name '{thing_name}' not found.")
+    return thing_def_key
+
 
 async def create_commands_tags(
         imei_list: List[str], tags_list: List[str]
-) -> Dict[str, Dict[str, Any]]:
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
     """
     Creates commands to add tags to devices.
 
     :param imei_list: A list of IMEI numbers.
     :param tags_list: A list of tags to add.
-    :return: A dictionary containing the created commands.
+    :return: An async iterator of (key, command) pairs.
 
     Example:
         imei_list = ["123456789012345", "987654321098765"]
         tags_list = ["sensor", "active"]
-        commands = await create_commands_tags(imei_list, tags_list)
-        print(commands)
+        async for key, command in create_commands_tags(imei_list, tags_list):
+            print(key, command)
     """
-    try:
-        return {
-            str(i): {
-                "command": "thing.tag.add",
-                "params": {"thingKey": imei_number, "tags": tags_list},
-            }
-            for i, imei_number in enumerate(imei_list, 1)
-        }
-    except Exception as e:
-        logger.error(f"Error creating tag commands: {e}")
-        raise
+    template = dict(_TAGS_PARAMS, tags=tags_list)
+    for i, imei_number in enumerate(imei_list, 1):
+        params = template.copy()
+        params["thingKey"] = imei_number
+        yield str(i), {"command": "thing.tag.add", "params": params}
 
 
 async def create_commands_device_profile(
         imei_list: List[str], profile_id: str
-) -> Dict[str, Dict[str, Any]]:
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
     """
     Creates commands to change device profiles.
 
     :param imei_list: A list of IMEI numbers.
     :param profile_id: The ID of the profile to apply.
-    :return: A dictionary containing the created commands.
+    :return: An async iterator of (key, command) pairs.
 
     Example:
         imei_list = ["123456789012345", "987654321098765"]
         profile_id = "profile_123"
-        commands = await create_commands_device_profile(imei_list, profile_id)
-        print(commands)
+        async for key, command in create_commands_device_profile(imei_list, profile_id):
+            print(key, command)
     """
-    try:
-        return {
-            str(i): {
-                "command": "lwm2m.device.profile.change",
-                "params": {"thingKey": imei_number, "profileId": profile_id},
-            }
-            for i, imei_number in enumerate(imei_list, 1)
-        }
-    except Exception as e:
-        logger.error(f"Error creating device profile commands: {e}")
-        raise
+    template = dict(_PROFILE_CHANGE_PARAMS, profileId=profile_id)
+    for i, imei_number in enumerate(imei_list, 1):
+        params = template.copy()
+        params["thingKey"] = imei_number
+        yield str(i), {"command": "lwm2m.device.profile.change", "params": params}
 
 
 async def create_commands_settings(
         imei_list: List[str], value_list: List[str]
-) -> Dict[str, Dict[str, Any]]:
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
     """
     Creates commands to publish attribute settings changes.
 
     :param imei_list: A list of IMEI numbers.
     :param value_list: A list of associated values.
-    :return: A dictionary containing the created commands.
+    :return: An async iterator of (key, command) pairs.
     :raises ValueError: If imei_list and value_list have different lengths.
 
     Example:
         imei_list = ["123456789012345", "987654321098765"]
         value_list = ["DM=Alarm,SI=900", "DI=86400"]
-        commands = await create_commands_settings(imei_list, value_list)
-        print(commands)
+        async for key, command in create_commands_settings(imei_list, value_list):
+            print(key, command)
     """
     if len(imei_list) != len(value_list):
         logger.error("IMEI list and value list must have the same length")
         raise ValueError("IMEI list and value list must have the same length")
 
-    try:
-        return {
-            str(i): {
-                "command": "attribute.publish",
-                "params": {
-                    "thingKey": imei_number,
-                    "key": "att_settings_change",
-                    "value": value,
-                },
-            }
-            for i, (imei_number, value) in enumerate(
-                zip(imei_list, value_list), start=1
-            )
-        }
-    except Exception as e:
-        logger.error(f"Error creating settings commands: {e}")
-        raise
+    for i, (imei_number, value) in enumerate(zip(imei_list, value_list), 1):
+        params = _SETTINGS_PARAMS.copy()
+        params["thingKey"] = imei_number
+        params["value"] = value
+        yield str(i), {"command": "attribute.publish", "params": params}
 
 
 async def create_commands_thing_def(
         imei_list: List[str], thing_key: str
-) -> Dict[str, Dict[str, Any]]:
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
     """
     Creates commands to change thing definitions.
 
     :param imei_list: A list of IMEI numbers.
     :param thing_key: The new thing definition key to apply.
-    :return: A dictionary containing the created commands.
+    :return: An async iterator of (key, command) pairs.
 
     Example:
         imei_list = ["123456789012345", "987654321098765"]
         thing_key = "new_def_key"
-        commands = await create_commands_thing_def(imei_list, thing_key)
-        print(commands)
+        async for key, command in create_commands_thing_def(imei_list, thing_key):
+            print(key, command)
     """
-    try:
-        return {
-            str(i): {
-                "command": "thing.def.change",
-                "params": {
-                    "key": imei_number,
-                    "newDefKey": thing_key,
-                    "dropProps": False,
-                    "dropAttrs": True,
-                    "dropAlarms": True,
-                },
-            }
-            for i, imei_number in enumerate(imei_list, start=1)
-        }
-    except Exception as e:
-        logger.error(f"Error creating thing definition commands: {e}")
-        raise
+    template = dict(_THING_DEF_CHANGE_PARAMS, newDefKey=thing_key)
+    for i, imei_number in enumerate(imei_list, 1):
+        params = template.copy()
+        params["key"] = imei_number
+        yield str(i), {"command": "thing.def.change", "params": params}
 
 
-async def create_commands_undeploy(imei_list: List[str]) -> Dict[str, Dict[str, Any]]:
+async def create_commands_undeploy(imei_list: List[str]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
     """
     Creates commands to undeploy devices by clearing their data destination.
 
     :param imei_list: A list of IMEI numbers.
-    :return: A dictionary containing the created commands.
+    :return: An async iterator of (key, command) pairs.
 
     Example:
         imei_list = ["123456789012345", "987654321098765"]
-        commands = await create_commands_undeploy(imei_list)
-        print(commands)
+        async for key, command in create_commands_undeploy(imei_list):
+            print(key, command)
     """
-    try:
-        return {
-            str(i): {
-                "command": "attribute.publish",
-                "params": {
-                    "thingKey": imei_number,
-                    "key": "data_destination",
-                    "value": "",
-                },
-            }
-            for i, imei_number in enumerate(imei_list, start=1)
-        }
-    except Exception as e:
-        logger.error(f"Error creating undeploy commands: {e}")
-        raise
+    for i, imei_number in enumerate(imei_list, 1):
+        params = _UNDEPLOY_PARAMS.copy()
+        params["thingKey"] = imei_number
+        yield str(i), {"command": "attribute.publish", "params": params}
 
 
 async def create_commands_delete_tag(
         imei_list: List[str], tags_list: List[str]
-) -> Dict[str, Dict[str, Any]]:
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
     """
     Creates commands to delete tags from devices.
 
     :param imei_list: A list of IMEI numbers.
     :param tags_list: A list of tags to delete.
-    :return: A dictionary containing the created commands.
+    :return: An async iterator of (key, command) pairs.
 
     Example:
         imei_list = ["123456789012345", "987654321098765"]
         tags_list = ["sensor", "inactive"]
-        commands = await create_commands_delete_tag(imei_list, tags_list)
-        print(commands)
+        async for key, command in create_commands_delete_tag(imei_list, tags_list):
+            print(key, command)
     """
-    try:
-        return {
-            str(i): {
-                "command": "thing.tag.delete",
-                "params": {"thingKey": imei_number, "tags": tags_list},
-            }
-            for i, imei_number in enumerate(imei_list, start=1)
-        }
-    except Exception as e:
-        logger.error(f"Error creating delete tag commands: {e}")
-        raise
+    template = dict(_TAGS_PARAMS, tags=tags_list)
+    for i, imei_number in enumerate(imei_list, 1):
+        params = template.copy()
+        params["thingKey"] = imei_number
+        yield str(i), {"command": "thing.tag.delete", "params": params}
 
 
 async def create_commands_delete_tags(
         thing_keys: Union[str, List[str]], tags_to_remove: List[str]
-) -> Dict[str, Dict[str, Any]]:
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
     """
     Creates commands to delete specified tags from one or more things.
 
     :param thing_keys: A single thing key or a list of thing keys to remove tags from.
     :param tags_to_remove: A list of tags to be removed from the specified thing(s).
-    :return: A dictionary containing the created commands.
+    :return: An async iterator of (key, command) pairs.
     :raises ValueError: If tags_to_remove is empty.
 
     Example:
         thing_keys = ["thing_123", "thing_456"]
         tags_to_remove = ["outdated", "inactive"]
-        commands = await create_commands_delete_tags(thing_keys, tags_to_remove)
-        print(commands)
+        async for key, command in create_commands_delete_tags(thing_keys, tags_to_remove):
+            print(key, command)
     """
     if not tags_to_remove:
         logger.error("tags_to_remove list cannot be empty")
         raise ValueError("tags_to_remove list cannot be empty")
 
-    try:
-        if isinstance(thing_keys, str):
-            thing_keys = [thing_keys]
+    if isinstance(thing_keys, str):
+        thing_keys = [thing_keys]
 
-        return {
-            str(i): {
-                "command": "thing.tag.delete",
-                "params": {"thingKey": thing_key, "tags": tags_to_remove},
-            }
-            for i, thing_key in enumerate(thing_keys, start=1)
-        }
-    except Exception as e:
-        logger.error(f"Error creating delete tag commands: {e}")
-        raise
+    template = dict(_TAGS_PARAMS, tags=tags_to_remove)
+    for i, thing_key in enumerate(thing_keys, 1):
+        params = template.copy()
+        params["thingKey"] = thing_key
+        yield str(i), {"command": "thing.tag.delete", "params": params}
 
 
 async def create_command_delete_things(
@@ -324,7 +382,14 @@ async def create_command_delete_things(
         commands = await create_command_delete_things(tags=["obsolete"])
         print(commands)
     """
-    if sum([bool(thing_keys), bool(thing_ids), bool(tags), bool(query)]) != 1:
+    criteria = (
+        bool(thing_keys)
+        | bool(thing_ids) << 1
+        | bool(tags) << 2
+        | bool(query) << 3
+    )
+    # Exactly one bit set: non-zero and clearing the lowest set bit leaves zero.
+    if not criteria or criteria & (criteria - 1):
         logger.error("Exactly one deletion criteria must be provided")
         raise ValueError("Exactly one deletion criteria must be provided")
 
@@ -339,11 +404,49 @@ async def create_command_delete_things(
     elif query:
         params["query"] = query
 
-    try:
-        return {"command": "thing.delete", "params": params}
-    except Exception as e:
-        logger.error(f"Error creating delete things command: {e}")
-        raise
+    return {"command": "thing.delete", "params": params}
+
+
+def _inventory_find_command(imei: str) -> Dict[str, Any]:
+    """Builds the command that looks up an IMEI in the module inventory."""
+    return {"command": "module.inventory.find", "params": {"identifiers": imei}}
+
+
+def _create_thing_command(
+        def_id: str, imei: str, tags: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Builds the command that creates a thing keyed and named by its IMEI."""
+    return {
+        "command": "thing.create",
+        "params": {
+            "defId": def_id,
+            "name": imei,
+            "key": imei,
+            "tags": tags,
+            "locEnabled": "1",
+        },
+    }
+
+
+def _create_module_command(inventory_id: str, thing_id: str) -> Dict[str, Any]:
+    """Builds the command that attaches an inventory module to a thing."""
+    return {
+        "command": "module.create",
+        "params": {"inventoryId": inventory_id, "thingId": thing_id},
+    }
+
+
+def _update_lwm2m_command(thing_id: str, profile_id: str, iot_id: str) -> Dict[str, Any]:
+    """Builds the command that applies an LWM2M profile to a thing."""
+    return {
+        "command": "lwm2m.device.update",
+        "params": {
+            "connection": "bootstrap_dtls",
+            "endpoint": iot_id,
+            "profileId": profile_id,
+            "thingId": thing_id,
+        },
+    }
 
 
 async def search_inventory(
@@ -357,12 +460,7 @@ async def search_inventory(
     :param api: An instance of the OneEdgeApi class.
     :return: The inventory item if found, or None if not found. The tuple contains the identifier ID and IoT ID.
     """
-    request = {
-        "command": "module.inventory.find",
-        "params": {
-            "identifiers": imei
-        }
-    }
+    request = _inventory_find_command(imei)
     try:
         response = await api.run_command(request)
         if not response.get("success"):
@@ -379,6 +477,34 @@ async def search_inventory(
         logger.error(f"Error searching inventory: {e}")
         raise RuntimeError(f"Error searching inventory: {e}")
 
+
+async def search_inventory_bulk(
+        imeis: List[str],
+        api: OneEdgeApi,
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Searches for the inventory items of many IMEI numbers with a single request.
+
+    :param imeis: The IMEI numbers to search for.
+    :param api: An instance of the OneEdgeApi class.
+    :return: The IMEIs that were found, mapped to their identifier ID and IoT ID.
+    :raises OneEdgeApiError: If the request itself fails.
+    """
+    found = await api.run_commands(
+        {str(i): _inventory_find_command(imei) for i, imei in enumerate(imeis, 1)}
+    )
+
+    inventory: Dict[str, Tuple[str, str]] = {}
+    for i, imei in enumerate(imeis, 1):
+        response = found.get(str(i), {})
+        if response.get("success"):
+            params = response.get("params", {})
+            inventory[imei] = (params.get("id"), params.get("iotId"))
+        else:
+            logger.warning(f"Thing {imei} not found: {_command_error(response)}")
+    return inventory
+
+
 async def create_thing(
         api: OneEdgeApi, def_id: str, imei: str, tags: Optional[List[str]]
 ) -> str:
@@ -397,16 +523,7 @@ async def create_thing(
     Raises:
     - RuntimeError: If the thing creation fails.
     """
-    request = {
-        "command": "thing.create",
-        "params": {
-            "defId": def_id,
-            "name": imei,
-            "key": imei,
-            "tags": tags,
-            "locEnabled": "1",
-        },
-    }
+    request = _create_thing_command(def_id, imei, tags)
     try:
         response = await api.run_command(request)
         if response.get('success'):
@@ -439,10 +556,7 @@ async def create_module(api: OneEdgeApi, inventory_id: str, thing_id: str) -> No
     Raises:
     - RuntimeError: If module creation fails.
     """
-    request = {
-        "command": "module.create",
-        "params": {"inventoryId": inventory_id, "thingId": thing_id},
-    }
+    request = _create_module_command(inventory_id, thing_id)
     try:
         response = await api.run_command(request)
         if response.get("success"):
@@ -482,15 +596,7 @@ async def update_lwm2m_profile(
             "thing_id, profile_id, and iot_id must all be provided and non-empty."
         )
 
-    request = {
-        "command": "lwm2m.device.update",
-        "params": {
-            "connection": "bootstrap_dtls",
-            "endpoint": iot_id,
-            "profileId": profile_id,
-            "thingId": thing_id,
-        },
-    }
+    request = _update_lwm2m_command(thing_id, profile_id, iot_id)
 
     try:
         response = await api.run_command(request)
@@ -507,48 +613,246 @@ async def update_lwm2m_profile(
         raise e
 
 
+async def _onboard_one(
+    api: OneEdgeApi,
+    imei: str,
+    profile_id: str,
+    thing_def_id: str,
+    tags: List[str],
+    semaphore: asyncio.Semaphore,
+    found: Optional[Tuple[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Onboards a single IMEI: finds it in the inventory, creates the thing and
+    its module, and applies the LWM2M profile.
+
+    Parameters:
+    - api: The API client capable of sending asynchronous commands.
+    - imei: The IMEI number to onboard.
+    - profile_id: The ID of the LWM2M profile to apply.
+    - thing_def_id: The ID of the Thing Definition to use for the new thing.
+    - tags: A list of tags to apply to the new thing.
+    - semaphore: Bounds how many IMEIs are onboarded concurrently.
+    - found: The IMEI's identifier ID and IoT ID if already looked up.
+
+    Returns:
+    - A dictionary with the IMEI, whether it succeeded and the error if it failed.
+    """
+    async with semaphore:
+        try:
+            inventory_id, iotId = found or await search_inventory(imei, api)
+            thing_id = await create_thing(api, def_id=thing_def_id, imei=imei, tags=tags)
+            if not thing_id:
+                raise RuntimeError("Failed to create new thing")
+
+            # Both only depend on the new thing, so overlap their round trips
+            await asyncio.gather(
+                create_module(api, inventory_id, thing_id),
+                update_lwm2m_profile(api, thing_id, profile_id, iotId),
+            )
+
+            logger.info(f"Successfully Onboarded {imei}")
+            return {"imei": imei, "success": True}
+
+        except Exception as e:
+            logger.error(f"Failed to onboard {imei}: {e}")
+            return {"imei": imei, "success": False, "error": str(e)}
+
+
 async def onboarding_things(
     api: OneEdgeApi,
     imei_list: List[str],
     profile_id: str,
     thing_def_id: str,
     tags: List[str],
-):
+    inventory: Optional[Dict[str, Tuple[str, str]]] = None,
+) -> List[Dict[str, Any]]:
     """
     Asynchronously creates new things and modules for a list of IMEI numbers.
 
+    All IMEIs are looked up in the inventory with one request up front, then
+    onboarded concurrently, at most ONBOARDING_CONCURRENCY at a time. IMEIs
+    missing from the lookup are searched for individually. A failure for one
+    IMEI does not stop the others.
+
     Parameters:
     - api: The API client capable of sending asynchronous commands.
     - imei_list: A list of IMEI numbers to onboard.
     - profile_id: The ID of the LWM2M profile to apply.
     - thing_def_id: The ID of the Thing Definition to use for the new things.
     - tags: A list of tags to apply to the new things and modules.
+    - inventory: IMEIs already looked up, mapped to their identifier ID and
+      IoT ID. Looked up in bulk when not given.
 
     Returns:
-    - None. Success or error is logged.
+    - A list with one result per IMEI, in the order of imei_list.
 
     Raises:
     - ValueError: If imei_list is empty or None.
-    - RuntimeError: If the API call fails.
     """
     if not all([imei_list, profile_id, thing_def_id, tags]):
         raise ValueError(
             "imei_list, profile_id, thing_def_id, and tags must all be provided and non-empty."
         )
 
-    for imei in imei_list:
+    if inventory is None:
         try:
-            inventory_id, iotId = await search_inventory(imei, api)
-            thing_id = await create_thing(api, def_id=thing_def_id, imei=imei, tags=tags)
-            if not thing_id:
-                logger.error("Failed to create new thing")
-                return
+            inventory = await search_inventory_bulk(imei_list, api)
+        except Exception as e:
+            logger.warning(f"Bulk inventory lookup failed, searching one by one: {e}")
+            inventory = {}
+
+    semaphore = asyncio.Semaphore(ONBOARDING_CONCURRENCY)
+    return await asyncio.gather(
+        *(
+            _onboard_one(
+                api, imei, profile_id, thing_def_id, tags, semaphore, inventory.get(imei)
+            )
+            for imei in imei_list
+        )
+    )
 
-            await create_module(api, inventory_id, thing_id)
-            await update_lwm2m_profile(api, thing_id, profile_id, iotId)
 
-            logger.info(f"Successfully Onboarded {imei}")
+def _command_error(response: Dict[str, Any]) -> str:
+    """Extracts a readable error from a failed command response."""
+    errors = response.get("errorMessages") or response.get("errorCodes") or []
+    return ", ".join(map(str, errors)) or "Unknown error"
+
+
+async def _onboard_batch(
+    api: OneEdgeApi,
+    imeis: List[str],
+    profile_id: str,
+    thing_def_id: str,
+    tags: List[str],
+) -> List[Dict[str, Any]]:
+    """
+    Onboards a chunk of IMEIs with one batched API call per pipeline stage:
+    inventory lookup, thing creation, then module creation together with the
+    LWM2M profile update.
+
+    Parameters:
+    - api: The API client capable of sending asynchronous commands.
+    - imeis: The IMEI numbers in this chunk.
+    - profile_id: The ID of the LWM2M profile to apply.
+    - thing_def_id: The ID of the Thing Definition to use for the new things.
+    - tags: A list of tags to apply to the new things.
+
+    Returns:
+    - A list with one result per IMEI, in the order of imeis.
+    """
+    failures: Dict[str, str] = {}
+
+    # Nothing has been written yet, so a failed lookup batch can safely be
+    # retried through the per-IMEI path.
+    try:
+        inventory = await search_inventory_bulk(imeis, api)
+    except Exception as e:
+        logger.warning(f"Batched inventory lookup failed, onboarding one by one: {e}")
+        return await onboarding_things(
+            api, imeis, profile_id, thing_def_id, tags, inventory={}
+        )
+
+    for imei in imeis:
+        if imei not in inventory:
+            failures[imei] = f"Thing {imei} not found or API call unsuccessful"
 
+    things: Dict[str, str] = {}
+    pending = list(inventory)
+    if pending:
+        try:
+            created = await api.run_commands(
+                {
+                    str(i): _create_thing_command(thing_def_id, imei, tags)
+                    for i, imei in enumerate(pending, 1)
+                }
+            )
+            for i, imei in enumerate(pending, 1):
+                response = created.get(str(i), {})
+                thing_id = response.get("params", {}).get("id")
+                if response.get("success") and thing_id:
+                    things[imei] = thing_id
+                else:
+                    failures[imei] = f"Error creating thing: {_command_error(response)}"
         except Exception as e:
-            logger.error(f"Failed to onboard {imei}: {e}")
+            failures.update({imei: f"Error creating thing: {e}" for imei in pending})
+
+    pending = list(things)
+    if pending:
+        commands: Dict[str, Dict[str, Any]] = {}
+        for i, imei in enumerate(pending):
+            inventory_id, iot_id = inventory[imei]
+            commands[str(2 * i + 1)] = _create_module_command(inventory_id, things[imei])
+            commands[str(2 * i + 2)] = _update_lwm2m_command(
+                things[imei], profile_id, iot_id
+            )
+        try:
+            attached = await api.run_commands(commands)
+            for i, imei in enumerate(pending):
+                module = attached.get(str(2 * i + 1), {})
+                profile = attached.get(str(2 * i + 2), {})
+                if not module.get("success"):
+                    failures[imei] = f"Error creating module: {_command_error(module)}"
+                elif not profile.get("success"):
+                    failures[imei] = (
+                        f"Failed to update LWM2M profile: {_command_error(profile)}"
+                    )
+        except Exception as e:
+            failures.update(
+                {imei: f"Error creating module: {e}" for imei in pending}
+            )
 
+    results: List[Dict[str, Any]] = []
+    for imei in imeis:
+        if imei in failures:
+            logger.error(f"Failed to onboard {imei}: {failures[imei]}")
+            results.append({"imei": imei, "success": False, "error": failures[imei]})
+        else:
+            logger.info(f"Successfully Onboarded {imei}")
+            results.append({"imei": imei, "success": True})
+    return results
+
+
+async def onboarding_things_batched(
+    api: OneEdgeApi,
+    imei_list: List[str],
+    profile_id: str,
+    thing_def_id: str,
+    tags: List[str],
+) -> List[Dict[str, Any]]:
+    """
+    Onboards IMEIs in chunks of ONBOARDING_BATCH_SIZE, sending each pipeline
+    stage of a chunk as a single multi-command request. This needs three
+    requests per chunk instead of four per IMEI.
+
+    Parameters:
+    - api: The API client capable of sending asynchronous commands.
+    - imei_list: A list of IMEI numbers to onboard.
+    - profile_id: The ID of the LWM2M profile to apply.
+    - thing_def_id: The ID of the Thing Definition to use for the new things.
+    - tags: A list of tags to apply to the new things and modules.
+
+    Returns:
+    - A list with one result per IMEI, in the order of imei_list.
+
+    Raises:
+    - ValueError: If imei_list is empty or None.
+    """
+    if not all([imei_list, profile_id, thing_def_id, tags]):
+        raise ValueError(
+            "imei_list, profile_id, thing_def_id, and tags must all be provided and non-empty."
+        )
+
+    semaphore = asyncio.Semaphore(ONBOARDING_BATCH_CONCURRENCY)
+
+    async def run_chunk(imeis: List[str]) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await _onboard_batch(api, imeis, profile_id, thing_def_id, tags)
+
+    chunks = await asyncio.gather(
+        *(
+            run_chunk(imei_list[i : i + ONBOARDING_BATCH_SIZE])
+            for i in range(0, len(imei_list), ONBOARDING_BATCH_SIZE)
+        )
+    )
+    return [result for chunk in chunks for result in chunk]
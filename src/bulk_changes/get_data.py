@@ -1,6 +1,6 @@
 import re
-from io import StringIO, BytesIO
-from typing import Tuple, List, Union
+from io import StringIO
+from typing import BinaryIO, Tuple, List, Union
 
 import aiofiles
 import asyncio
@@ -11,27 +11,39 @@ from src.logger.logger import Logger
 logger = Logger(__name__)
 
 
-async def read_file(file: Union[str, BytesIO]) -> pd.DataFrame:
+def _parse_stream(file: BinaryIO) -> pd.DataFrame:
+    """
+    Parses a binary stream as CSV, falling back to Excel.
+
+    :param file: A readable binary file object.
+    :return: A pandas DataFrame containing the stream's content.
+    """
+    # Reset the file pointer to the beginning
+    file.seek(0)
+    # Try to read as CSV first
+    try:
+        return pd.read_csv(file, header=None)
+    except Exception:
+        # If CSV fails, try Excel
+        file.seek(0)
+        return pd.read_excel(file, header=None)
+
+
+async def read_file(file: Union[str, BinaryIO]) -> pd.DataFrame:
     """
     Reads an Excel or CSV file and returns the content as a pandas DataFrame.
 
-    :param file: The path to the input file or a BytesIO object. Must be either .xlsx or .csv format.
+    Binary streams (e.g. the spooled file behind an upload) are parsed directly
+    in a worker thread, so the content is never copied into memory as a whole
+    and the event loop is not blocked while pandas decodes it.
+
+    :param file: The path to the input file or a binary file object. Must be either .xlsx or .csv format.
     :return: A pandas DataFrame containing the file's content.
     :raises ValueError: If the file format is unsupported.
     :raises FileNotFoundError: If the specified file does not exist.
     :raises pd.errors.EmptyDataError: If the file is empty.
     """
-    if isinstance(file, BytesIO):
-        # Reset the file pointer to the beginning
-        file.seek(0)
-        # Try to read as CSV first
-        try:
-            return pd.read_csv(file, header=None)
-        except:
-            # If CSV fails, try Excel
-            file.seek(0)
-            return pd.read_excel(file, header=None)
-    elif isinstance(file, str):
+    if isinstance(file, str):
         if file.lower().endswith(".xlsx"):
             return await asyncio.to_thread(pd.read_excel, file, header=None)
         elif file.lower().endswith(".csv"):
@@ -42,8 +54,10 @@ async def read_file(file: Union[str, BytesIO]) -> pd.DataFrame:
             raise ValueError(
                 "Unsupported file format. Only .xlsx and .csv files are supported."
             )
+    elif hasattr(file, "read"):
+        return await asyncio.to_thread(_parse_stream, file)
     else:
-        raise ValueError("Invalid input type. Expected string or BytesIO object.")
+        raise ValueError("Invalid input type. Expected string or binary file object.")
 
 
 async def deduplicate_imeis(imei_list: List[str], settings_list: List[str]) -> Tuple[List[str], List[str]]:
@@ -73,12 +87,12 @@ async def deduplicate_imeis(imei_list: List[str], settings_list: List[str]) -> T
 
 
 async def read_imei_and_setting(
-    file: Union[str, BytesIO]
+    file: Union[str, BinaryIO]
 ) -> Tuple[List[str], List[str]]:
     """
     Reads IMEI numbers and settings from an Excel or CSV file.
 
-    :param file: The path to the input file or a BytesIO object. Must be either .xlsx or .csv format.
+    :param file: The path to the input file or a binary file object. Must be either .xlsx or .csv format.
     :return: A tuple containing two lists:
              - The first list contains unique IMEI numbers.
              - The second list contains corresponding settings (as strings).
@@ -157,17 +171,17 @@ async def read_imei_and_setting(
     return unique_ids, unique_settings
 
 
-async def read_imei_only(file_path: str) -> List[str]:
+async def read_imei_only(file: Union[str, BinaryIO]) -> List[str]:
     """
     Reads only IMEI numbers from an Excel or CSV file.
 
-    :param file_path: The path to the input file. Must be either .xlsx or .csv format.
+    :param file: The path to the input file or a binary file object. Must be either .xlsx or .csv format.
     :return: A list containing unique IMEI numbers.
     :raises ValueError: If the file format is unsupported or if no IMEI column is found.
     :raises FileNotFoundError: If the specified file does not exist.
     :raises pd.errors.EmptyDataError: If the file is empty.
     """
-    df: pd.DataFrame = await read_file(file_path)
+    df: pd.DataFrame = await read_file(file)
 
     if df.empty:
         raise ValueError("The file contains no data.")
@@ -0,0 +1,21 @@
+"""
+Dependencies
+
+Shared FastAPI dependencies for the auth and api routers.
+"""
+
+from fastapi import Request
+
+from src.oneEdge.oneEdgeAPI import ENDPOINT_URL, OneEdgeApi
+
+
+async def get_api(request: Request) -> OneEdgeApi:
+    """
+    Create a request-scoped OneEdgeApi that borrows the process-wide HTTP
+    session opened in the application lifespan, so concurrent requests never
+    see each other's session state while still sharing keep-alive connections.
+
+    Declared async so FastAPI resolves it on the event loop instead of
+    dispatching it to the threadpool like a plain function dependency.
+    """
+    return OneEdgeApi(ENDPOINT_URL, session=request.app.state.http)
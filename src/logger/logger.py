@@ -1,15 +1,54 @@
 """
 Logger module for the application.
 """
+import atexit
+import gzip
 import logging
+import queue
+import shutil
+import sys
 import time
 import os
-from functools import wraps
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
 from typing import Any, Callable, Dict, Optional, TypeVar, Literal
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import (
+    MemoryHandler,
+    QueueHandler,
+    QueueListener,
+    TimedRotatingFileHandler,
+)
 
 T = TypeVar("T")
 
+# None of these record fields are used by the log formats, so skip collecting them
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+# Records buffered before the file is written, unless an ERROR arrives first
+FILE_BUFFER_CAPACITY: int = 512
+# Longest context value written to a log line, e.g. a large error payload
+MAX_CONTEXT_VALUE_LENGTH: int = 1000
+
+# One queue handler per log file, shared by every Logger writing to that file
+_queue_handlers: Dict[str, QueueHandler] = {}
+
+
+@lru_cache(maxsize=None)
+def _log_directory() -> str:
+    """
+    Get the log directory in the project root.
+
+    Returns:
+        str: The absolute path of the log directory.
+    """
+    project_root = os.path.abspath(
+        os.path.join(os.path.dirname(__file__), "..", "..")
+    )
+    return os.path.join(project_root, "logs")
+
 
 class ColorFormatter(logging.Formatter):
     """
@@ -43,6 +82,10 @@ class ColorFormatter(logging.Formatter):
         """
         super().__init__(fmt, datefmt, style)
         self.use_color: bool = use_color
+        self._reset: str = self.RESET_CODE if use_color else ""
+        self._color_by_level: Dict[int, str] = (
+            dict(self.COLOR_CODES) if use_color else {}
+        )
 
     def format(self, record: logging.LogRecord) -> str:
         """
@@ -54,14 +97,76 @@ class ColorFormatter(logging.Formatter):
         Returns:
             str: The formatted log record.
         """
-        if self.use_color:
-            record.color_on = self.COLOR_CODES.get(record.levelno, self.RESET_CODE)
-            record.color_off = self.RESET_CODE
-        else:
-            record.color_on = record.color_off = ""
+        record.color_on = self._color_by_level.get(record.levelno, self._reset)
+        record.color_off = self._reset
         return super().format(record)
 
 
+class CompressingTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    Timed rotating file handler that gzips rotated files on a worker thread.
+    """
+
+    # A single worker, so compressions never overlap
+    _compressor: ThreadPoolExecutor = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="log-compress"
+    )
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Initialize the CompressingTimedRotatingFileHandler.
+
+        Args:
+            *args (Any): Arguments for TimedRotatingFileHandler.
+            **kwargs (Any): Keyword arguments for TimedRotatingFileHandler.
+        """
+        super().__init__(*args, **kwargs)
+        self.namer = lambda name: name + ".gz"
+
+    def rotate(self, source: str, dest: str) -> None:
+        """
+        Rename the current log out of the way and compress it in the background.
+        Until it is compressed the log is kept under a hidden name, so
+        getFilesToDelete() can't pick it up and delete it mid-read.
+
+        Args:
+            source (str): The current log file.
+            dest (str): The compressed file to rotate to.
+        """
+        if not os.path.exists(source):
+            return
+        dirname, basename = os.path.split(dest[: -len(".gz")])
+        pending = os.path.join(dirname, "." + basename)
+        os.rename(source, pending)
+        self._compressor.submit(self._compress, pending, dest)
+
+    @staticmethod
+    def _compress(source: str, dest: str) -> None:
+        """
+        Gzip a rotated log file and remove the uncompressed copy. Runs on the
+        worker thread, so errors are reported to stderr rather than raised.
+
+        Args:
+            source (str): The rotated log file.
+            dest (str): The compressed file to write.
+        """
+        try:
+            f_in = open(source, "rb")
+        except FileNotFoundError:
+            # Already removed; there is nothing left to compress
+            return
+        try:
+            with f_in, gzip.open(dest, "wb") as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            os.unlink(source)
+        except OSError:
+            if logging.raiseExceptions:
+                sys.stderr.write(
+                    f"--- Logging error ---\nFailed to compress {source}\n"
+                )
+                traceback.print_exc(file=sys.stderr)
+
+
 class Logger:
     """
     Logger class for the application.
@@ -89,39 +194,72 @@ class Logger:
         if not self.logger.handlers:
             self.logger.setLevel(log_level)
 
-            log_format = "{color_on}[{asctime}] [{levelname}] {message}{color_off}"
-            date_format = "%Y-%m-%d %H:%M:%S"
-            formatter = ColorFormatter(
-                fmt=log_format, datefmt=date_format, style='{'
-            )
-            formatter.converter = time.gmtime  # Use GMT for timestamps
-
-            # StreamHandler for console output
-            stream_handler = logging.StreamHandler()
-            stream_handler.setFormatter(formatter)
-
-            # Determine the log directory in the project root
-            project_root = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..")
-            )
-            log_directory = os.path.join(project_root, "logs")
-            os.makedirs(log_directory, exist_ok=True)
-
-            # FileHandler for log file with rotation
+            log_directory = _log_directory()
             log_file_path = os.path.join(log_directory, log_file)
-            file_handler = TimedRotatingFileHandler(
-                log_file_path,
-                when="D",
-                interval=rotation_days,
-                backupCount=backup_count,
-            )
-            file_handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s"))
-            file_handler.setLevel(log_level)
-
-            self.logger.addHandler(stream_handler)
-            self.logger.addHandler(file_handler)
+
+            queue_handler = _queue_handlers.get(log_file_path)
+            if queue_handler is None:
+                os.makedirs(log_directory, exist_ok=True)
+                queue_handler = self._start_queue_listener(
+                    log_file_path, rotation_days, backup_count
+                )
+                _queue_handlers[log_file_path] = queue_handler
+
+            self.logger.addHandler(queue_handler)
             self.logger.propagate = False  # Avoid duplicate logs
 
+    @staticmethod
+    def _start_queue_listener(
+        log_file_path: str, rotation_days: int, backup_count: int
+    ) -> QueueHandler:
+        """
+        Start a background listener that writes queued records to the console
+        and to a rotating log file, so log calls never block on I/O.
+
+        Args:
+            log_file_path (str): The file where logs will be stored.
+            rotation_days (int): Number of days between log rotations.
+            backup_count (int): Number of backup files to keep.
+
+        Returns:
+            QueueHandler: The handler that enqueues records for the listener.
+        """
+        log_format = "%(color_on)s[%(asctime)s] [%(levelname)s] %(message)s%(color_off)s"
+        date_format = "%Y-%m-%d %H:%M:%S"
+        formatter = ColorFormatter(fmt=log_format, datefmt=date_format)
+        formatter.converter = time.gmtime  # Use GMT for timestamps
+
+        # StreamHandler for console output
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+
+        # FileHandler for log file with rotation, written in batches
+        file_handler = CompressingTimedRotatingFileHandler(
+            log_file_path,
+            when="D",
+            interval=rotation_days,
+            backupCount=backup_count,
+        )
+        file_handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s"))
+        file_handler.terminator = "\n"
+        buffered_file_handler = MemoryHandler(
+            capacity=FILE_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=file_handler,
+        )
+
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        listener = QueueListener(log_queue, stream_handler, buffered_file_handler)
+        listener.start()
+
+        def stop_listener() -> None:
+            listener.stop()
+            buffered_file_handler.close()
+            file_handler.close()
+
+        atexit.register(stop_listener)
+        return QueueHandler(log_queue)
+
     def set_log_level(self, level: int) -> None:
         """
         Dynamically set the logging level.
@@ -130,8 +268,6 @@ class Logger:
             level (int): The new logging level.
         """
         self.logger.setLevel(level)
-        for handler in self.logger.handlers:
-            handler.setLevel(level)
 
     def _log_with_context(self, level: int, message: str, **context: Any) -> None:
         """
@@ -142,9 +278,15 @@ class Logger:
             message (str): The message to log.
             **context: Additional context to include in the log message.
         """
-        context_str = " ".join(f"{k}={v}" for k, v in context.items())
-        full_message = f"{message} [{context_str}]" if context_str else message
-        self.logger.log(level, full_message)
+        if not self.logger.isEnabledFor(level):
+            return
+        if not context:
+            self.logger.log(level, message)
+            return
+        context_str = " ".join(
+            ["%s=%.*s" % (k, MAX_CONTEXT_VALUE_LENGTH, v) for k, v in context.items()]
+        )
+        self.logger.log(level, f"{message} [{context_str}]")
 
     def info(self, message: str, **context: Any) -> None:
         """
@@ -204,7 +346,8 @@ class Logger:
             message (str): The message to log.
             **context: Additional context to include in the log message.
         """
-        self.logger.exception(message, extra=context)
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.exception(message, extra=context)
 
     @staticmethod
     def log_execution(
@@ -230,6 +373,8 @@ class Logger:
             Returns:
                 Callable[..., T]: A wrapper function.
             """
+            logger = Logger(func.__module__)
+
             @wraps(func)
             def wrapper(*args: Any, **kwargs: Any) -> T:
                 """
@@ -242,7 +387,6 @@ class Logger:
                 Returns:
                     T: The result of the function.
                 """
-                logger = Logger(func.__module__)
                 logger._log_with_context(level, f"Executing {func.__name__}")
                 result = func(*args, **kwargs)
                 logger._log_with_context(level, f"Finished executing {func.__name__}")
@@ -5,17 +5,42 @@ This module provides a class to interact with the oneEdge API.
 """
 
 import asyncio
+import random
+import time
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
 
 import aiohttp
-from cachetools import TTLCache
-from fastapi import HTTPException
+import orjson
 
 from src.logger.logger import Logger
 
 logger = Logger(__name__)
 
+ENDPOINT_URL = "https://api-de.devicewise.com/api"
+JSON_HEADERS = {"Content-Type": "application/json"}
+HTTP_POOL_SIZE = 64
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """
+    Creates an HTTP session that can be shared by OneEdgeApi instances so
+    connections to the API endpoint are kept alive between requests.
+
+    Returns:
+        aiohttp.ClientSession: The shared HTTP session.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        limit_per_host=HTTP_POOL_SIZE,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+    )
+    # Per-phase limits rather than a total deadline: a large write batch may
+    # legitimately take longer than any fixed total to be processed
+    timeout = aiohttp.ClientTimeout(total=None, connect=5, sock_read=30)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
 
 class AuthState(Enum):
     """Authentication state"""
@@ -28,35 +53,72 @@ class AuthState(Enum):
 class OneEdgeApiError(Exception):
     """oneEdge API Error"""
 
-    def __init__(self, message: str):
+    status_code: int = 500
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
         """
         Initializes a new instance of the class.
 
         Args:
             message (str): The error message.
+            status_code (Optional[int]): The HTTP status to report the error
+                with, if not the class default.
         """
         self.message = message
+        if status_code is not None:
+            self.status_code = status_code
         super().__init__(message)
 
 
+class AuthError(OneEdgeApiError):
+    """Authentication with the oneEdge API failed"""
+
+    status_code = 401
+
+
+class MfaRequiredError(AuthError):
+    """The login must be completed with an MFA code"""
+
+    status_code = 403
+
+
+class ServiceUnavailableError(OneEdgeApiError):
+    """The oneEdge API could not be reached"""
+
+    status_code = 503
+
+
 class OneEdgeApi:
     """
     OneEdge API Class
     """
 
     MAX_RETRIES: int = 3
-    RETRY_DELAY: int = 5
+    RETRY_DELAY: float = 1.0
+    RETRY_MAX_DELAY: float = 30.0
     ITERATION_LIMIT: int = 100
-
-    def __init__(self, endpoint_url: str):
+    ITERATION_DELAY: float = 0.0
+    BATCH_SIZE: int = 500
+    BATCH_CONCURRENCY: int = 8
+    SESSION_TTL: int = 28800
+
+    def __init__(
+        self, endpoint_url: str, session: Optional[aiohttp.ClientSession] = None
+    ):
         """
         Initializes a new instance of the OneEdgeApi class.
 
         Args:
             endpoint_url (str): The URL of the oneEdge API endpoint.
+            session (Optional[aiohttp.ClientSession]): A shared HTTP session to
+                reuse. If not provided, the instance opens its own session on
+                first use and keeps it until aclose() is called.
         """
         self.endpoint_url: str = endpoint_url
-        self._session_cache: TTLCache = TTLCache(maxsize=1, ttl=28800)
+        self._http_session: Optional[aiohttp.ClientSession] = session
+        self._owns_http_session: bool = False
+        self._session_id: Optional[str] = None
+        self._session_expires_at: float = 0.0
         self._last_error: Optional[int] = None
         self._auth_state: AuthState = AuthState.NOT_AUTHENTICATED
         self.username: str = ""
@@ -64,12 +126,15 @@ class OneEdgeApi:
     @property
     def session_id(self) -> Optional[str]:
         """Gets the session id"""
-        return self._session_cache.get("session_id")
+        if time.monotonic() < self._session_expires_at:
+            return self._session_id
+        return None
 
     @session_id.setter
     def session_id(self, value: Optional[str]) -> None:
         """Sets the session id"""
-        self._session_cache["session_id"] = value
+        self._session_id = value
+        self._session_expires_at = time.monotonic() + self.SESSION_TTL
         self._auth_state = self._calculate_auth_state()
 
     @property
@@ -102,9 +167,12 @@ class OneEdgeApi:
         Returns:
             AuthState: The calculated authentication state.
         """
-        if self.session_id is not None:
+        if (
+            self._session_id is not None
+            and time.monotonic() < self._session_expires_at
+        ):
             return AuthState.AUTHENTICATED
-        if self.last_error == -90041:
+        if self._last_error == -90041:
             return AuthState.WAITING_FOR_MFA
         return AuthState.NOT_AUTHENTICATED
 
@@ -121,12 +189,8 @@ class OneEdgeApi:
         Raises:
             OneEdgeApiError: If an error occurs while making the request.
         """
-        try:
-            result = await self.run_commands({"1": command})
-            return result.get("1", result)
-        except OneEdgeApiError as e:
-            logger.exception("An error occurred while making the request", error=str(e))
-            raise HTTPException(status_code=500, detail=str(e))
+        result = await self.run_commands({"1": command})
+        return result.get("1", result)
 
     async def run_commands(self, cmds: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -141,42 +205,216 @@ class OneEdgeApi:
         Raises:
             OneEdgeApiError: If failed to receive a response from the API.
         """
-        payload: Dict[str, Any] = {"auth": {"sessionId": self.session_id}}
-        payload.update(cmds)
+        # cmds go last so an api.authenticate command under "auth" wins
+        payload: Dict[str, Any] = {"auth": {"sessionId": self.session_id}, **cmds}
 
-        async with aiohttp.ClientSession() as session:
-            for retry_count in range(self.MAX_RETRIES):
-                try:
-                    async with session.post(
-                        self.endpoint_url, json=payload
-                    ) as response:
-                        response_data = await response.json()
-                        if response_data is None:
-                            raise HTTPException(
-                                status_code=500,
-                                detail="Received empty response from API",
-                            )
-                        return self._process_response(response_data, cmds)
-                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                    logger.error(
-                        "An error occurred while making the request",
-                        error=str(e),
-                        retry_count=retry_count,
-                    )
-                    if retry_count < self.MAX_RETRIES - 1:
-                        await asyncio.sleep(self.RETRY_DELAY)
-                    else:
+        session = await self._get_session()
+        return await self._post_commands(session, payload, cmds)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the HTTP session, opening an owned one if none was provided.
+
+        Returns:
+            aiohttp.ClientSession: The HTTP session to use for requests.
+
+        Raises:
+            ServiceUnavailableError: If the provided session has been closed,
+                e.g. during application shutdown.
+        """
+        if self._http_session is None:
+            self._http_session = create_http_session()
+            self._owns_http_session = True
+        elif self._http_session.closed:
+            raise ServiceUnavailableError("HTTP session is closed")
+        return self._http_session
+
+    async def aclose(self) -> None:
+        """Close the HTTP session if this instance opened it."""
+        if self._owns_http_session and self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+            self._owns_http_session = False
+
+    async def run_batched_commands(
+        self, cmds: AsyncIterable[Tuple[str, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Run a stream of commands as concurrent batches of BATCH_SIZE, with at
+        most BATCH_CONCURRENCY batches in flight at once. Commands are pulled
+        from the stream only when a batch slot is free, so at most
+        BATCH_CONCURRENCY + 1 batches are held in memory regardless of how
+        many commands the stream yields.
+
+        A batch that fails with an OneEdgeApiError does not cancel the others:
+        its commands are reported as failed, with the error in "errorMessages",
+        so callers can tell which writes were applied. If every batch failed
+        the first error is raised instead. If the command stream itself
+        raises, batches already submitted are left to finish before the error
+        is re-raised.
+
+        Args:
+            cmds (AsyncIterable[Tuple[str, Dict[str, Any]]]): The (key, command)
+                pairs to be executed.
+
+        Returns:
+            Dict[str, Any]: The merged results of all batches.
+
+        Raises:
+            OneEdgeApiError: If every batch failed.
+        """
+        semaphore = asyncio.Semaphore(self.BATCH_CONCURRENCY)
+        tasks: List["asyncio.Task[Dict[str, Any]]"] = []
+        errors: List[OneEdgeApiError] = []
+
+        async def run_batch(batch: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+            try:
+                return await self.run_commands(batch)
+            except OneEdgeApiError as e:
+                logger.error(
+                    "Command batch failed", batch_size=len(batch), error=e.message
+                )
+                errors.append(e)
+                error_messages = [e.message]
+                result: Dict[str, Any] = {
+                    key: {
+                        "success": False,
+                        "errorCodes": [],
+                        "errorMessages": error_messages,
+                    }
+                    for key in batch
+                }
+                result["success"] = False
+                result["errorCodes"] = []
+                result["errorMessages"] = error_messages
+                return result
+            finally:
+                semaphore.release()
+
+        async def submit(batch: Dict[str, Dict[str, Any]]) -> None:
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(run_batch(batch)))
+
+        try:
+            batch: Dict[str, Dict[str, Any]] = {}
+            async for key, cmd in cmds:
+                batch[key] = cmd
+                if len(batch) == self.BATCH_SIZE:
+                    await submit(batch)
+                    batch = {}
+            if batch or not tasks:
+                await submit(batch)
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # Batches already sent are writes; let them finish rather than
+            # leave them half-applied upstream
+            if tasks:
+                await asyncio.wait(tasks)
+            raise
+
+        if len(errors) == len(results):
+            raise errors[0]
+        if len(results) == 1:
+            return results[0]
+
+        merged: Dict[str, Any] = {}
+        error_codes: List[Any] = []
+        error_messages: List[str] = []
+        for result in results:
+            error_codes.extend(result.get("errorCodes", []))
+            error_messages.extend(result.get("errorMessages", []))
+            merged.update(result)
+        merged["success"] = all(result.get("success") for result in results)
+        merged["errorCodes"] = error_codes
+        if error_messages:
+            merged["errorMessages"] = error_messages
+        return merged
+
+    async def _post_commands(
+        self,
+        session: aiohttp.ClientSession,
+        payload: Dict[str, Any],
+        cmds: Dict[str, Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Post a command payload to the API, retrying on connection errors and
+        5xx responses with exponential backoff and jitter. 4xx responses,
+        invalid responses and read timeouts are not retried, since the
+        commands may already have been applied.
+
+        Args:
+            session (aiohttp.ClientSession): The HTTP session to use.
+            payload (Dict[str, Any]): The full request payload.
+            cmds (Dict[str, Dict[str, Any]]): The commands being executed.
+
+        Returns:
+            Dict[str, Any]: The processed results.
+        """
+        body = orjson.dumps(payload)
+        for retry_count in range(self.MAX_RETRIES):
+            try:
+                async with session.post(
+                    self.endpoint_url, data=body, headers=JSON_HEADERS
+                ) as response:
+                    if response.status >= 500:
+                        error = f"HTTP {response.status}"
+                    elif response.status >= 400:
                         logger.error(
-                            "Failed to make the request after multiple retries",
-                            max_retries=self.MAX_RETRIES,
+                            "The API rejected the request", status=response.status
                         )
-                        raise HTTPException(
-                            status_code=503, detail="Service unavailable"
+                        raise OneEdgeApiError(
+                            f"API request failed with status {response.status}",
+                            status_code=502,
                         )
+                    else:
+                        response_data = orjson.loads(await response.read())
+                        if response_data is None:
+                            raise OneEdgeApiError("Received empty response from API")
+                        return self._process_response(response_data, cmds)
+            except aiohttp.ConnectionTimeoutError as e:
+                # Raised before the request is sent, so it is safe to retry
+                error = str(e) or "Connection timed out"
+            except asyncio.TimeoutError as e:
+                logger.error("Timed out waiting for the API response")
+                raise OneEdgeApiError(
+                    "Timed out waiting for the API response", status_code=504
+                ) from e
+            except aiohttp.ClientConnectionError as e:
+                error = str(e)
+            except (aiohttp.ClientError, orjson.JSONDecodeError) as e:
+                logger.error("Received an invalid response from the API", error=str(e))
+                raise OneEdgeApiError(
+                    "Received an invalid response from the API", status_code=502
+                ) from e
+
+            logger.error(
+                "An error occurred while making the request",
+                error=error,
+                retry_count=retry_count,
+            )
+            if retry_count < self.MAX_RETRIES - 1:
+                await asyncio.sleep(self._retry_delay(retry_count))
 
-        raise HTTPException(
-            status_code=500, detail="Failed to receive a response from the API."
+        logger.error(
+            "Failed to make the request after multiple retries",
+            max_retries=self.MAX_RETRIES,
         )
+        raise ServiceUnavailableError("Service unavailable")
+
+    def _retry_delay(self, retry_count: int) -> float:
+        """
+        Get the backoff before the next retry. The delay doubles per attempt up
+        to RETRY_MAX_DELAY, and is jittered so concurrent callers do not retry
+        in lockstep.
+
+        Args:
+            retry_count (int): The number of the attempt that just failed.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        delay = min(self.RETRY_MAX_DELAY, self.RETRY_DELAY * 2**retry_count)
+        return delay * (0.5 + random.random())
 
     def _process_response(
         self, response_data: Dict[str, Any], cmds: Dict[str, Any]
@@ -193,50 +431,74 @@ class OneEdgeApi:
         """
         results: Dict[str, Any] = response_data
 
-        if "success" in response_data and not response_data["success"]:
-            for cmd_key in cmds:
-                results[cmd_key] = {
-                    "success": False,
-                    "errorCodes": response_data.get("errorCodes", []),
-                }
-        else:
+        if results.get("success", True):
             results["success"] = True
-            results["errorCodes"] = []
-
-        if results["errorCodes"]:
-            self.last_error = results["errorCodes"][0]
+            error_codes: List[Any] = []
+            results["errorCodes"] = error_codes
         else:
-            self.last_error = None
+            error_codes = results.setdefault("errorCodes", [])
+            for cmd_key in cmds:
+                results[cmd_key] = {"success": False, "errorCodes": error_codes}
+
+        last_error = error_codes[0] if error_codes else None
+        # Only go through the setter, and recompute the auth state, on a change
+        if last_error != self._last_error:
+            self.last_error = last_error
 
         return results
 
-    async def run_iterated_command(self, cmd: Dict[str, Any]) -> List[Any]:
+    async def iter_iterated_command(
+        self, cmd: Dict[str, Any]
+    ) -> AsyncIterator[List[Any]]:
         """
-        Run an iterated command with pagination.
+        Run an iterated command with pagination, yielding each page of results
+        as it arrives so callers need not hold every page at once. Each page
+        needs the iterator returned by the previous one, so pages are fetched
+        back to back, with an optional ITERATION_DELAY pause in between.
 
         Args:
             cmd (Dict[str, Any]): The command to be executed iteratively.
 
-        Returns:
-            List[Any]: The aggregated results from all iterations.
+        Yields:
+            List[Any]: The results of one page.
         """
         cmd["params"].update(
             {"iterator": "new", "useSearch": True, "limit": 2000, "showCount": False}
         )
 
-        results: List[Any] = []
         for iteration in range(self.ITERATION_LIMIT):
             result = await self.run_command(cmd)
             if not result["success"]:
                 logger.warning("Iterated command unsuccessful", iteration=iteration)
-                return results
+                return
 
-            results.extend(result["params"]["result"])
-            cmd["params"]["iterator"] = result["params"]["iterator"]
+            params = result["params"]
+            page = params["result"]
+            iterator = params.get("iterator")
+            if page:
+                yield page
+            if not page or not iterator:
+                return
+            cmd["params"]["iterator"] = iterator
 
-            await asyncio.sleep(0.5)
+            if self.ITERATION_DELAY:
+                await asyncio.sleep(self.ITERATION_DELAY)
 
         logger.warning("Reached maximum iteration limit", limit=self.ITERATION_LIMIT)
+
+    async def run_iterated_command(self, cmd: Dict[str, Any]) -> List[Any]:
+        """
+        Run an iterated command with pagination and collect every page.
+
+        Args:
+            cmd (Dict[str, Any]): The command to be executed iteratively.
+
+        Returns:
+            List[Any]: The aggregated results from all iterations.
+        """
+        results: List[Any] = []
+        async for page in self.iter_iterated_command(cmd):
+            results += page
         return results
 
     async def authenticate(self, username: str, password: str) -> bool:
@@ -251,7 +513,8 @@ class OneEdgeApi:
             bool: True if authentication was successful.
 
         Raises:
-            HTTPException: If authentication fails or MFA is required.
+            MfaRequiredError: If an MFA code is required to complete the login.
+            AuthError: If authentication fails.
         """
         auth_payload: Dict[str, Dict[str, Any]] = {
             "auth": {
@@ -260,26 +523,22 @@ class OneEdgeApi:
             }
         }
 
-        try:
-            result = await self.run_commands(auth_payload)
-            auth_response = result.get("auth", {})
+        result = await self.run_commands(auth_payload)
+        auth_response = result.get("auth", {})
 
-            if auth_response.get("success"):
-                self.session_id = auth_response["params"].get("sessionId")
-                self.auth_state = AuthState.AUTHENTICATED
-                self.username = username
-                logger.info("Authentication successful", username=username)
-                return True
-            else:
-                self.last_error = auth_response.get("errorCodes", [None])[0]
-                if self.last_error == -90041:
-                    self.auth_state = AuthState.WAITING_FOR_MFA
-                    raise HTTPException(status_code=403, detail="MFA required")
-                self.auth_state = AuthState.NOT_AUTHENTICATED
-                raise HTTPException(status_code=401, detail="Authentication failed")
-        except OneEdgeApiError as error:
-            logger.exception("An error occurred while authenticating", error=str(error))
-            raise HTTPException(status_code=500, detail="Authentication error")
+        if auth_response.get("success"):
+            self.session_id = auth_response["params"].get("sessionId")
+            self.auth_state = AuthState.AUTHENTICATED
+            self.username = username
+            logger.info("Authentication successful", username=username)
+            return True
+
+        self.last_error = auth_response.get("errorCodes", [None])[0]
+        if self.last_error == -90041:
+            self.auth_state = AuthState.WAITING_FOR_MFA
+            raise MfaRequiredError("MFA required")
+        self.auth_state = AuthState.NOT_AUTHENTICATED
+        raise AuthError("Authentication failed")
 
     def is_session_valid(self) -> bool:
         """
@@ -292,32 +551,36 @@ class OneEdgeApi:
             self.auth_state == AuthState.AUTHENTICATED and self.session_id is not None
         )
 
-    async def submit_mfa(self, mfa_code: str) -> bool:
+    async def submit_mfa(self, mfa_code: str, username: Optional[str] = None) -> bool:
         """
         Submit the MFA code to the API.
 
         Args:
             mfa_code (str): The 6-digit TOTP code.
+            username (Optional[str]): The username the pending login belongs to.
+                Required when the login was started on another instance.
 
         Returns:
             bool: True if MFA authentication was successful.
 
         Raises:
-            HTTPException: If MFA authentication fails or is not required.
+            OneEdgeApiError: If MFA authentication fails or is not required.
         """
+        if username is not None:
+            self.username = username
+            self.auth_state = AuthState.WAITING_FOR_MFA
+
         if self.auth_state != AuthState.WAITING_FOR_MFA:
-            raise HTTPException(status_code=400, detail="MFA not required")
+            raise OneEdgeApiError("MFA not required", status_code=400)
 
         try:
             return await self.authenticate(self.username, mfa_code)
-        except HTTPException as e:
-            if e.status_code == 403 and e.detail == "MFA required":
-                logger.error("Unexpected MFA required response during MFA submission")
-                raise HTTPException(
-                    status_code=500, detail="Unexpected authentication state"
-                )
+        except MfaRequiredError:
+            logger.error("Unexpected MFA required response during MFA submission")
+            raise OneEdgeApiError("Unexpected authentication state")
+        except OneEdgeApiError:
             self.auth_state = AuthState.NOT_AUTHENTICATED
-            raise e
+            raise
 
     async def switch_organization(self, org_id: str) -> bool:
         """
@@ -330,27 +593,19 @@ class OneEdgeApi:
             bool: True if the switch was successful.
 
         Raises:
-            HTTPException: If the switch fails or the user is not authenticated.
+            AuthError: If the user is not authenticated.
+            OneEdgeApiError: If the switch fails.
         """
         if self.auth_state != AuthState.AUTHENTICATED:
-            raise HTTPException(status_code=401, detail="User not authenticated")
+            raise AuthError("User not authenticated")
 
-        try:
-            result = await self.run_command(
-                {"command": "session.org.switch", "params": {"id": org_id}}
-            )
-            if result.get("success"):
-                logger.info(f"Successfully switched to organization {org_id}")
-                return True
-            else:
-                raise HTTPException(
-                    status_code=400, detail="Failed to switch organization"
-                )
-        except OneEdgeApiError as error:
-            logger.exception(
-                "An error occurred while switching organizations", error=str(error)
-            )
-            raise HTTPException(status_code=500, detail="Organization switch error")
+        result = await self.run_command(
+            {"command": "session.org.switch", "params": {"id": org_id}}
+        )
+        if result.get("success"):
+            logger.info(f"Successfully switched to organization {org_id}")
+            return True
+        raise OneEdgeApiError("Failed to switch organization", status_code=400)
 
     async def close_session(self) -> Optional[Dict[str, Any]]:
         """
@@ -369,17 +624,14 @@ class OneEdgeApi:
 
             if res is None:
                 logger.error("Received 'None' response when closing the session")
-                raise HTTPException(status_code=500, detail="Failed to close session")
+                raise OneEdgeApiError("Failed to close session")
 
             if not res.get("success"):
                 logger.error("Error closing session", error_codes=res.get("errorCodes"))
-                raise HTTPException(status_code=500, detail="Failed to close session")
+                raise OneEdgeApiError("Failed to close session")
             return res
-        except OneEdgeApiError as e:
-            logger.exception(
-                "An error occurred while closing the session", error=str(e)
-            )
-            raise HTTPException(status_code=500, detail="Failed to close session")
+        finally:
+            await self.aclose()
 
     async def verify_auth_state(self) -> bool:
         """Verifies the current authentication state of the API."""
@@ -417,7 +669,8 @@ class OneEdgeApi:
             bool: True if authentication was successful.
 
         Raises:
-            HTTPException: If authentication fails or MFA is required.
+            MfaRequiredError: If an MFA code is required to complete the login.
+            OneEdgeApiError: If authentication fails.
         """
         self.username = username
 
@@ -430,13 +683,28 @@ class OneEdgeApi:
                     logger.error(
                         "Failed to verify authentication state", username=username
                     )
-                    raise HTTPException(status_code=401, detail="Authentication failed")
+                    raise AuthError("Authentication failed")
             return False
-        except HTTPException as e:
-            if e.status_code == 403 and e.detail == "MFA required":
-                raise e
+        except MfaRequiredError:
+            raise
+        except OneEdgeApiError as e:
             logger.error("Authentication failed", error=str(e))
-            raise e
+            raise
+
+    async def verify_session(self, session_id: str) -> Optional[str]:
+        """
+        Binds a session to this instance and verifies it against the API.
+
+        Args:
+            session_id (str): The session ID to verify.
+
+        Returns:
+            Optional[str]: The session's username if it is valid, None otherwise.
+        """
+        self.session_id = session_id
+        if await self._verify_auth_state():
+            return self.username
+        return None
 
     async def _verify_auth_state(self) -> bool:
         """
@@ -448,5 +716,5 @@ class OneEdgeApi:
         try:
             await self.verify_auth_state()
             return self.auth_state == AuthState.AUTHENTICATED
-        except HTTPException:
+        except OneEdgeApiError:
             return False
@@ -0,0 +1,84 @@
+"""
+Session Cache Module
+
+This module keeps a short-lived record of sessions that were verified against
+the oneEdge API, so the verification round trip is not repeated on every request.
+"""
+
+import asyncio
+import hashlib
+from typing import Optional
+from weakref import WeakValueDictionary
+
+from cachetools import TTLCache
+
+from src.oneEdge.oneEdgeAPI import OneEdgeApi
+
+SESSION_CACHE_TTL: int = 30
+SESSION_CACHE_SIZE: int = 10000
+
+# Keyed by a digest of the session ID so raw session IDs are never held here
+_verified_sessions: TTLCache = TTLCache(
+    maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL
+)
+# One lock per session being verified; entries vanish once no request holds them
+_verify_locks: "WeakValueDictionary[bytes, asyncio.Lock]" = WeakValueDictionary()
+
+
+def cache_key(session_id: str) -> bytes:
+    """
+    Hashes a session ID into a cache key.
+
+    Args:
+        session_id (str): The oneEdge session ID.
+
+    Returns:
+        bytes: The cache key.
+    """
+    return hashlib.blake2b(session_id.encode(), digest_size=16).digest()
+
+
+async def get_verified_user(session_id: str, api: OneEdgeApi) -> Optional[str]:
+    """
+    Binds the session to the API instance and returns its username, verifying
+    it against the oneEdge API only if it was not verified within the TTL.
+    Concurrent requests for the same session share a single verification.
+
+    Args:
+        session_id (str): The oneEdge session ID.
+        api (OneEdgeApi): The request-scoped API instance.
+
+    Returns:
+        Optional[str]: The username if the session is valid, None otherwise.
+    """
+    api.session_id = session_id
+    key = cache_key(session_id)
+    username = _verified_sessions.get(key)
+    if username is not None:
+        api.username = username
+        return username
+
+    lock = _verify_locks.get(key)
+    if lock is None:
+        lock = _verify_locks[key] = asyncio.Lock()
+
+    async with lock:
+        username = _verified_sessions.get(key)
+        if username is not None:
+            api.username = username
+            return username
+        username = await api.verify_session(session_id)
+        if username is not None:
+            _verified_sessions[key] = username
+        return username
+
+
+def invalidate(session_id: Optional[str]) -> None:
+    """
+    Removes a session from the cache, e.g. after logout.
+
+    Args:
+        session_id (Optional[str]): The oneEdge session ID.
+    """
+    if session_id:
+        _verified_sessions.pop(cache_key(session_id), None)
@@ -0,0 +1,112 @@
+"""
+Static Files Module
+
+This module provides a StaticFiles subclass that adds cache headers to assets
+and serves precompressed variants when they exist.
+"""
+
+import os
+import re
+from mimetypes import guess_type
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Scope
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Matches content-hashed file names such as "bundle.3f2a9c1d.js"
+HASHED_ASSET_PATTERN = re.compile(r"\.[a-f0-9]{8,}\.")
+
+# Precompressed siblings in order of preference, e.g. "bundle.js.br"
+PRECOMPRESSED_ENCODINGS: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles that marks content-hashed assets as immutable, makes browsers
+    revalidate everything else, and prefers precompressed siblings of a file
+    when the client accepts them.
+    """
+
+    @staticmethod
+    def _find_precompressed(
+        full_path: PathLike, stat_result: os.stat_result, accept_encoding: str
+    ) -> Optional[Tuple[str, str, os.stat_result]]:
+        """
+        Find a precompressed sibling of the file that the client accepts.
+        Siblings older than the file are stale and skipped.
+
+        Args:
+            full_path (PathLike): The path of the uncompressed file.
+            stat_result (os.stat_result): The stat result of the file.
+            accept_encoding (str): The Accept-Encoding header of the request.
+
+        Returns:
+            Optional[Tuple[str, str, os.stat_result]]: The encoding, path and
+            stat result of the sibling, or None if there is no usable sibling.
+        """
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accept_encoding:
+                continue
+            compressed_path = f"{full_path}{suffix}"
+            try:
+                compressed_stat = os.stat(compressed_path)
+            except OSError:
+                continue
+            if compressed_stat.st_mtime >= stat_result.st_mtime:
+                return encoding, compressed_path, compressed_stat
+        return None
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        """
+        Build the file response, adding a long-lived Cache-Control header for
+        hashed assets so browsers stop revalidating them, and "no-cache" for
+        unhashed files (index.html, bundle.js) so a deploy is picked up on the
+        next ETag check. A ".br" or ".gz" sibling is served instead of the file
+        if the client accepts it and it is not older than the file.
+
+        Args:
+            full_path (PathLike): The path of the file on disk.
+            stat_result (os.stat_result): The stat result of the file.
+            scope (Scope): The ASGI scope of the request.
+            status_code (int): The status code of the response.
+
+        Returns:
+            Response: The file response, or a 304 response if not modified.
+        """
+        request_headers = Headers(scope=scope)
+
+        precompressed = self._find_precompressed(
+            full_path, stat_result, request_headers.get("accept-encoding", "")
+        )
+        if precompressed is not None:
+            encoding, compressed_path, compressed_stat = precompressed
+            response = FileResponse(
+                compressed_path,
+                status_code=status_code,
+                stat_result=compressed_stat,
+                media_type=guess_type(full_path)[0] or "text/plain",
+            )
+            response.headers["Content-Encoding"] = encoding
+            response.headers["Vary"] = "Accept-Encoding"
+        else:
+            response = FileResponse(
+                full_path, status_code=status_code, stat_result=stat_result
+            )
+        if HASHED_ASSET_PATTERN.search(os.path.basename(full_path)):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response